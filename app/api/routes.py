@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from typing import List
 import logging
 
 from app.application.dtos import (
@@ -25,7 +27,8 @@ async def search_products(
 ):
     try:
         results = await service.search_products(request)
-        return results
+        # Serialize directly; the service builds trusted DTOs
+        return ORJSONResponse(results.model_dump())
     except Exception as e:
         logger.error(f"Error in search: {e}", exc_info=True)
         raise HTTPException(
@@ -34,6 +37,33 @@ async def search_products(
         )
 
 
+@router.post(
+    "/search/batch",
+    response_model=List[ProductSearchResponseDTO],
+    summary="search products in batch",
+    description="Semantic search for several queries in one request"
+)
+async def search_products_batch(
+        requests: List[ProductSearchRequestDTO],
+        service: ProductSearchService = Depends(get_product_search_service),
+        settings: Settings = Depends(get_settings)
+):
+    if len(requests) > settings.MAX_BATCH_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BATCH_QUERIES} queries are allowed per batch"
+        )
+    try:
+        results = await service.search_products_batch(requests)
+        return ORJSONResponse([result.model_dump() for result in results])
+    except Exception as e:
+        logger.error(f"Error in batch search: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error occurred in batch search: {str(e)}"
+        )
+
+
 @router.get(
     "/health",
     summary="Checking the health of the search system"
@@ -65,13 +95,20 @@ async def get_stats(
     """Get statistics on indexed products"""
     try:
         repo = service.repository
-        total_products = len(repo._products_cache)
+        total_products = repo.get_total_products()
         indexed_count = repo.collection.count()
 
+        if total_products is None:
+            status = "unknown"
+        elif total_products == indexed_count:
+            status = "synced"
+        else:
+            status = "out_of_sync"
+
         return {
             "total_products": total_products,
             "indexed_documents": indexed_count,
-            "status": "synced" if total_products == indexed_count else "out_of_sync"
+            "status": status
         }
     except Exception as e:
         logger.error(f"Error getting stats: {e}", exc_info=True)
@@ -15,6 +15,10 @@ class ProductSearchRequestDTO(BaseModel):
         ge=1,
         description="number of results (optional)"
     )
+    no_cache: bool = Field(
+        default=False,
+        description="bypass cached query embeddings and responses"
+    )
 
     @field_validator('query')
     @classmethod
@@ -43,15 +47,6 @@ class ProductDTO(BaseModel):
     @classmethod
     def from_entity(cls, product) -> "ProductDTO":
         """Convert domain entity to DTO"""
-        import re
-
-        # Clean HTML from description
-        clean_desc = re.sub('<[^<]+?>', '', product.description)
-        clean_desc = re.sub(r'\s+', ' ', clean_desc).strip()
-
-        # Create preview
-        preview = clean_desc[:200] + "..." if len(clean_desc) > 200 else clean_desc
-
         # Price display
         if product.price is not None:
             if isinstance(product.price, str):
@@ -61,12 +56,12 @@ class ProductDTO(BaseModel):
         else:
             price_display = "قیمت: تماس بگیرید"
 
-        return cls(
+        return cls.model_construct(
             id=product.id,
             name=product.name,
             slug=product.slug,
             permalink=product.permalink,
-            description_preview=preview,
+            description_preview=product.description_preview,
             price_display=price_display
         )
 
@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional
+from app.domain.entities import SearchResult
 from app.domain.repositories import ProductRepository
 from app.application.dtos import (
     ProductSearchRequestDTO,
@@ -7,6 +8,7 @@ from app.application.dtos import (
     ProductDTO
 )
 from app.core.config import Settings
+from app.infrastructure.semantic_cache import SemanticCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,9 +17,15 @@ logger = logging.getLogger(__name__)
 class ProductSearchService:
     """Service for product search operations"""
 
-    def __init__(self, repository: ProductRepository, settings: Settings):
+    def __init__(
+            self,
+            repository: ProductRepository,
+            settings: Settings,
+            response_cache: Optional[SemanticCache] = None
+    ):
         self.repository = repository
         self.settings = settings
+        self.response_cache = response_cache
 
     async def search_products(
             self,
@@ -26,42 +34,118 @@ class ProductSearchService:
         """
         Search products using semantic search
         """
-        # Use default top_k from settings if not provided
-        top_k = request.top_k or self.settings.DEFAULT_SEARCH_TOP_K
-
-        # Ensure top_k doesn't exceed maximum
-        top_k = min(top_k, self.settings.MAX_SEARCH_TOP_K)
+        top_k = self._resolve_top_k(request)
 
         logger.info(f"Searching for: '{request.query}' with top_k={top_k}")
 
+        query_embedding = await self.repository.embed_query(
+            request.query,
+            use_cache=not request.no_cache
+        )
+
+        # Serve near-duplicate queries from the response cache
+        cache_namespace = (top_k, self.settings.MIN_RELEVANCE_SCORE)
+        if self.response_cache is not None and not request.no_cache:
+            cached = self.response_cache.get(query_embedding, cache_namespace)
+            if cached is not None:
+                logger.info(f"Response cache hit for: '{request.query}'")
+                return cached.model_copy(update={"query": request.query})
+
         # Perform search
         results = await self.repository.search_products(
             query=request.query,
-            top_k=top_k
+            top_k=top_k,
+            min_relevance_score=self.settings.MIN_RELEVANCE_SCORE,
+            use_cache=not request.no_cache,
+            query_embedding=query_embedding
         )
 
-        # Filter by minimum relevance score
-        filtered_results = [
-            result for result in results
-            if result.relevance_score >= self.settings.MIN_RELEVANCE_SCORE
-        ]
+        logger.info(
+            f"Found {len(results)} results "
+            f"(min_score={self.settings.MIN_RELEVANCE_SCORE})"
+        )
+
+        response = self._build_response(request.query, results)
+
+        if self.response_cache is not None:
+            self.response_cache.put(query_embedding, response, cache_namespace)
+
+        return response
+
+    async def search_products_batch(
+            self,
+            requests: List[ProductSearchRequestDTO]
+    ) -> List[ProductSearchResponseDTO]:
+        """
+        Search several queries with one encode pass and one vector query
+        """
+        top_ks = [self._resolve_top_k(request) for request in requests]
+        logger.info(f"Batch searching {len(requests)} queries")
+
+        query_embeddings = await self.repository.embed_queries(
+            [request.query for request in requests],
+            use_cache=[not request.no_cache for request in requests]
+        )
+
+        # Serve what we can from the response cache
+        responses: List[Optional[ProductSearchResponseDTO]] = [None] * len(requests)
+        if self.response_cache is not None:
+            for i, request in enumerate(requests):
+                if request.no_cache:
+                    continue
+                cached = self.response_cache.get(
+                    query_embeddings[i],
+                    (top_ks[i], self.settings.MIN_RELEVANCE_SCORE)
+                )
+                if cached is not None:
+                    responses[i] = cached.model_copy(update={"query": request.query})
+
+        misses = [i for i, response in enumerate(responses) if response is None]
+        batch_results = await self.repository.search_products_batch(
+            query_embeddings=[query_embeddings[i] for i in misses],
+            top_ks=[top_ks[i] for i in misses],
+            min_relevance_score=self.settings.MIN_RELEVANCE_SCORE
+        )
+
+        for i, results in zip(misses, batch_results):
+            responses[i] = self._build_response(requests[i].query, results)
+            if self.response_cache is not None:
+                self.response_cache.put(
+                    query_embeddings[i],
+                    responses[i],
+                    (top_ks[i], self.settings.MIN_RELEVANCE_SCORE)
+                )
 
         logger.info(
-            f"Found {len(filtered_results)} results "
-            f"(filtered from {len(results)} by min_score={self.settings.MIN_RELEVANCE_SCORE})"
+            f"Batch search done ({len(requests) - len(misses)} served from cache)"
         )
+        return responses
 
-        # Convert to DTOs
+    def _resolve_top_k(self, request: ProductSearchRequestDTO) -> int:
+        """Apply the default and maximum top_k from settings"""
+        # Use default top_k from settings if not provided
+        top_k = request.top_k or self.settings.DEFAULT_SEARCH_TOP_K
+
+        # Ensure top_k doesn't exceed maximum
+        return min(top_k, self.settings.MAX_SEARCH_TOP_K)
+
+    def _build_response(
+            self,
+            query: str,
+            results: List[SearchResult]
+    ) -> ProductSearchResponseDTO:
+        """Convert search results to the response DTO"""
+        # Convert to DTOs (data is produced here, so skip re-validation)
         result_dtos = [
-            SearchResultDTO(
+            SearchResultDTO.model_construct(
                 product=ProductDTO.from_entity(result.product),
                 relevance_score=round(result.relevance_score, 3)
             )
-            for result in filtered_results
+            for result in results
         ]
 
-        return ProductSearchResponseDTO(
-            query=request.query,
+        return ProductSearchResponseDTO.model_construct(
+            query=query,
             results=result_dtos,
             total_found=len(result_dtos),
             min_relevance_score=self.settings.MIN_RELEVANCE_SCORE
@@ -10,11 +10,22 @@ class Settings(BaseSettings):
     API_PREFIX: str
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    THREAD_POOL_SIZE: int = 16
 
     CHROMA_PERSIST_DIR: str
     COLLECTION_NAME: str
+    HNSW_M: int = 32
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64
+    INDEX_BATCH_SIZE: int = 256
+    READ_ONLY: bool = False
+    FORCE_REINDEX: bool = False
 
     EMBEDDING_MODEL_NAME: str
+    EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_CACHE_TTL: float = 3600.0
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_DELAY: float = 0.02
 
     DATA_ROOT_DIR: str
     PRODUCTS_JSON_FILENAME: str
@@ -22,6 +33,11 @@ class Settings(BaseSettings):
     DEFAULT_SEARCH_TOP_K: int = 5
     MAX_SEARCH_TOP_K: int = 20
     MIN_RELEVANCE_SCORE: float = 0.3
+    MAX_BATCH_QUERIES: int = 32
+
+    RESPONSE_CACHE_SIZE: int = 512
+    RESPONSE_CACHE_SIMILARITY: float = 0.95
+    RESPONSE_CACHE_TTL: float = 600.0
 
     LOG_LEVEL: str = "INFO"
 
@@ -35,14 +51,19 @@ class Settings(BaseSettings):
         """Full path to ChromaDB persistence directory"""
         return Path(self.CHROMA_PERSIST_DIR)
 
+    @property
+    def index_manifest_path(self) -> Path:
+        """Full path to the index manifest written during loading"""
+        return self.chroma_persist_path / "index_manifest.json"
+
     def validate_paths(self) -> None:
         """Validate that required paths exist"""
         # Create directories if they don't exist
         self.chroma_persist_path.mkdir(parents=True, exist_ok=True)
         Path(self.DATA_ROOT_DIR).mkdir(parents=True, exist_ok=True)
 
-        # Check if products file exists
-        if not self.products_json_path.exists():
+        # Check if products file exists (read-only workers never load it)
+        if not self.READ_ONLY and not self.products_json_path.exists():
             raise FileNotFoundError(
                 f"Products JSON file not found at: {self.products_json_path}"
             )
@@ -2,6 +2,7 @@ from functools import lru_cache
 from app.core.config import get_settings, Settings
 from app.infrastructure.embeddings import EmbeddingService
 from app.infrastructure.vector_store import ChromaProductRepository
+from app.infrastructure.semantic_cache import SemanticCache
 from app.application.services import ProductSearchService
 import logging
 
@@ -10,6 +11,7 @@ logger = logging.getLogger(__name__)
 # Singletons
 _embedding_service = None
 _product_repository = None
+_response_cache = None
 
 
 def get_embedding_service() -> EmbeddingService:
@@ -18,7 +20,13 @@ def get_embedding_service() -> EmbeddingService:
     if _embedding_service is None:
         settings = get_settings()
         logger.info(f"Initializing EmbeddingService with model: {settings.EMBEDDING_MODEL_NAME}")
-        _embedding_service = EmbeddingService(settings.EMBEDDING_MODEL_NAME)
+        _embedding_service = EmbeddingService(
+            settings.EMBEDDING_MODEL_NAME,
+            cache_size=settings.EMBEDDING_CACHE_SIZE,
+            cache_ttl=settings.EMBEDDING_CACHE_TTL,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            batch_max_delay=settings.EMBEDDING_BATCH_MAX_DELAY
+        )
     return _embedding_service
 
 
@@ -36,8 +44,21 @@ def get_product_repository() -> ChromaProductRepository:
     return _product_repository
 
 
+def get_response_cache() -> SemanticCache:
+    """Get or create search response cache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        _response_cache = SemanticCache(
+            max_size=settings.RESPONSE_CACHE_SIZE,
+            similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY,
+            ttl=settings.RESPONSE_CACHE_TTL
+        )
+    return _response_cache
+
+
 def get_product_search_service() -> ProductSearchService:
     """Get product search service"""
     repository = get_product_repository()
     settings = get_settings()
-    return ProductSearchService(repository, settings)
+    return ProductSearchService(repository, settings, get_response_cache())
@@ -10,6 +10,7 @@ class Product(BaseModel):
     slug: str
     permalink: str
     description: str
+    description_preview: str = ""
     price: str
     date_created: datetime
     status: str
@@ -12,8 +12,39 @@ class ProductRepository(ABC):
         pass
 
     @abstractmethod
-    async def search_products(self, query: str, top_k: int = 5) -> List[SearchResult]:
-        """Search products by semantic similarity"""
+    async def embed_query(self, query: str, use_cache: bool = True) -> List[float]:
+        """Generate embedding for a search query"""
+        pass
+
+    @abstractmethod
+    async def search_products(
+            self,
+            query: str,
+            top_k: int = 5,
+            min_relevance_score: float = 0.0,
+            use_cache: bool = True,
+            query_embedding: Optional[List[float]] = None
+    ) -> List[SearchResult]:
+        """Search products by semantic similarity above a relevance threshold"""
+        pass
+
+    @abstractmethod
+    async def embed_queries(
+            self,
+            queries: List[str],
+            use_cache: Optional[List[bool]] = None
+    ) -> List[List[float]]:
+        """Generate embeddings for several search queries, with a cache flag per query"""
+        pass
+
+    @abstractmethod
+    async def search_products_batch(
+            self,
+            query_embeddings: List[List[float]],
+            top_ks: List[int],
+            min_relevance_score: float = 0.0
+    ) -> List[List[SearchResult]]:
+        """Search several query embeddings at once, one result list per query"""
         pass
 
     @abstractmethod
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Callable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text encode requests into batched calls"""
+
+    def __init__(
+            self,
+            encode_batch: Callable[[List[str]], np.ndarray],
+            max_batch_size: int = 32,
+            max_delay: float = 0.02
+    ):
+        self._encode_batch = encode_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue: Optional["asyncio.Queue[Tuple[str, asyncio.Future]]"] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Start the background batching task on the running loop"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ Embedding batcher started "
+            f"(max_batch_size={self.max_batch_size}, max_delay={self.max_delay}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the batching task and fail any pending requests"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding batcher stopped"))
+        self._queue = None
+        logger.info("Embedding batcher stopped")
+
+    async def submit(self, text: str) -> List[float]:
+        """Queue a text for encoding and wait for its embedding"""
+        if not self.is_running:
+            raise RuntimeError("Embedding batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """Wait for one request, then gather more until size or delay limit"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            logger.debug(f"Encoding batch of {len(texts)} queries")
+            try:
+                embeddings = await loop.run_in_executor(None, self._encode_batch, texts)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Embedding batcher stopped"))
+                raise
+            except Exception as e:
+                logger.error(f"Batch encoding failed: {e}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding.tolist())
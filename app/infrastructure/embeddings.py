@@ -1,30 +1,155 @@
 from sentence_transformers import SentenceTransformer
-from typing import List
+import torch
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import asyncio
+import threading
+import time
 import logging
 
+import numpy as np
+
+from app.infrastructure.embedding_batcher import EmbeddingBatcher
+
 logger = logging.getLogger(__name__)
 
+# Arabic code points that are commonly typed in place of their Persian forms
+_PERSIAN_CHAR_MAP = str.maketrans({
+    "ي": "ی",
+    "ى": "ی",
+    "ك": "ک",
+    "‌": " ",  # ZWNJ
+})
+
+
+def _normalize_query(text: str) -> str:
+    """Normalize query text into a cache key"""
+    return " ".join(text.translate(_PERSIAN_CHAR_MAP).split()).lower()
+
 
 class EmbeddingService:
     """Service for generating embeddings with Persian support"""
 
-    def __init__(self, model_name: str):
+    def __init__(
+            self,
+            model_name: str,
+            cache_size: int = 1024,
+            cache_ttl: float = 3600.0,
+            batch_size: int = 32,
+            batch_max_delay: float = 0.02
+    ):
         logger.info(f"Loading embedding model: {model_name}")
         self.model_name = model_name
         self.model = SentenceTransformer(model_name)
-        logger.info(f"✅ Embedding model loaded successfully")
+        if torch.cuda.is_available():
+            # Half precision halves weight bandwidth on GPU
+            self.model = self.model.half().to('cuda')
+        logger.info(f"✅ Embedding model loaded successfully on {self.model.device}")
+
+        # LRU cache of query embeddings: key -> (created_at, embedding)
+        self._cache: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._cache_lock = threading.Lock()
+
+        self.batcher = EmbeddingBatcher(
+            self._encode_batch,
+            max_batch_size=batch_size,
+            max_delay=batch_max_delay
+        )
+
+    def _cache_key(self, text: str, use_cache: bool) -> Optional[str]:
+        """Cache key for a query, or None when caching is off for it"""
+        if not use_cache or self._cache_size <= 0:
+            return None
+        return _normalize_query(text)
+
+    def _cache_get(self, key: Optional[str]) -> Optional[List[float]]:
+        """Return cached embedding if present and not expired"""
+        if key is None:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            created_at, embedding = entry
+            if self._cache_ttl > 0 and time.monotonic() - created_at > self._cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            logger.debug(f"Embedding cache hit for key: '{key}'")
+            return embedding
+
+    def _cache_put(self, key: Optional[str], embedding: List[float]) -> None:
+        """Store embedding and evict least recently used entries"""
+        if key is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), embedding)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
 
-    def embed_text(self, text: str) -> List[float]:
+    def clear_cache(self) -> None:
+        """Drop all cached query embeddings"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def embed_text(self, text: str, use_cache: bool = True) -> List[float]:
         """Generate embedding for single text"""
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return self.embed_queries([text], [use_cache])[0]
+
+    async def embed_text_async(self, text: str, use_cache: bool = True) -> List[float]:
+        """Generate embedding for single text via the shared batcher"""
+        if not self.batcher.is_running:
+            return await asyncio.to_thread(self.embed_text, text, use_cache)
+
+        key = self._cache_key(text, use_cache)
+        embedding = self._cache_get(key)
+        if embedding is None:
+            embedding = await self.batcher.submit(text)
+            self._cache_put(key, embedding)
+        return embedding
+
+    def embed_queries(
+            self,
+            texts: List[str],
+            use_cache: Optional[List[bool]] = None
+    ) -> List[List[float]]:
+        """Generate embeddings for several queries, encoding cache misses in one call"""
+        if use_cache is None:
+            use_cache = [True] * len(texts)
+        keys = [self._cache_key(text, cache) for text, cache in zip(texts, use_cache)]
+        embeddings: List[Optional[List[float]]] = [self._cache_get(key) for key in keys]
+
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if misses:
+            encoded = self._encode_batch([texts[i] for i in misses])
+            for i, embedding in zip(misses, encoded.tolist()):
+                embeddings[i] = embedding
+                self._cache_put(keys[i], embedding)
+        return embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode a batch of queries collected by the batcher"""
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+    def warmup(self) -> None:
+        """Run a throwaway batch so the first request skips kernel setup"""
+        self.model.encode(["warmup"] * 4, batch_size=4, normalize_embeddings=True)
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Generate normalized embeddings for multiple texts"""
         logger.info(f"Generating embeddings for {len(texts)} texts")
-        embeddings = self.model.encode(
+        return self.model.encode(
             texts,
+            batch_size=64,
             convert_to_numpy=True,
+            normalize_embeddings=True,
             show_progress_bar=True
         )
-        return embeddings.tolist()
@@ -0,0 +1,98 @@
+from typing import Any, Dict, Hashable, List, Optional
+import threading
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """In-memory cache of values keyed by query embedding similarity"""
+
+    def __init__(
+            self,
+            max_size: int = 512,
+            similarity_threshold: float = 0.95,
+            ttl: float = 600.0
+    ):
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+
+        # Entry slots; the vector matrix is allocated on first insert
+        self._vecs: Optional[np.ndarray] = None
+        self._slot_namespaces = np.full(max_size, -1, dtype=np.int64)
+        self._created = np.zeros(max_size, dtype=np.float64)
+        self._last_used = np.zeros(max_size, dtype=np.float64)
+        self._values: List[Any] = [None] * max_size
+
+        self._namespace_ids: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def _live_mask(self, namespace_id: int, now: float) -> np.ndarray:
+        mask = self._slot_namespaces == namespace_id
+        if self.ttl > 0:
+            mask &= (now - self._created) <= self.ttl
+        return mask
+
+    def get(self, embedding: List[float], namespace: Hashable = None) -> Optional[Any]:
+        """Return the value of the most similar cached query, if similar enough"""
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            namespace_id = self._namespace_ids.get(namespace)
+            if namespace_id is None or self._vecs is None:
+                return None
+
+            now = time.monotonic()
+            mask = self._live_mask(namespace_id, now)
+            if not mask.any():
+                return None
+
+            query = np.asarray(embedding, dtype=np.float32)
+            sims = np.where(mask, self._vecs @ query, -np.inf)
+            best = int(np.argmax(sims))
+            if sims[best] < self.similarity_threshold:
+                return None
+
+            self._last_used[best] = now
+            logger.debug(f"Semantic cache hit (similarity={sims[best]:.3f})")
+            return self._values[best]
+
+    def put(self, embedding: List[float], value: Any, namespace: Hashable = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            vector = np.asarray(embedding, dtype=np.float32)
+            if self._vecs is None:
+                self._vecs = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+
+            namespace_id = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            now = time.monotonic()
+
+            # Empty and expired slots are reused before evicting live entries
+            free_mask = self._slot_namespaces == -1
+            if self.ttl > 0:
+                free_mask |= (now - self._created) > self.ttl
+            free = np.flatnonzero(free_mask)
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+
+            self._vecs[slot] = vector
+            self._slot_namespaces[slot] = namespace_id
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._values[slot] = value
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._slot_namespaces.fill(-1)
+            self._values = [None] * self.max_size
@@ -1,8 +1,13 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
+from selectolax.parser import HTMLParser
 from typing import List, Optional
+from datetime import datetime
+import asyncio
+import hashlib
 import json
-import re
+import orjson
+import os
 from pathlib import Path
 import logging
 
@@ -13,6 +18,16 @@ from app.core.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Product fields persisted in Chroma metadata alongside each embedding
+_PRODUCT_METADATA_FIELDS = {
+    "name", "slug", "permalink", "description", "description_preview",
+    "price", "date_created", "status"
+}
+
+# Raw HTML window scanned when building a description preview
+_PREVIEW_RAW_LIMIT = 2048
+_PREVIEW_LENGTH = 200
+
 
 class ChromaProductRepository(ProductRepository):
     """ChromaDB implementation of ProductRepository"""
@@ -37,10 +52,7 @@ class ChromaProductRepository(ProductRepository):
         )
 
         # Get or create collection with name from config
-        self.collection = self.client.get_or_create_collection(
-            name=settings.COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
-        )
+        self.collection = self._open_collection()
 
         logger.info(
             f"✅ ChromaDB initialized. "
@@ -48,155 +60,405 @@ class ChromaProductRepository(ProductRepository):
             f"Documents: {self.collection.count()}"
         )
 
-        self._products_cache: List[Product] = []
+        self._manifest: Optional[dict] = None
+
+    def _open_collection(self):
+        """Open the existing collection as persisted, creating it if missing"""
+        # get_or_create_collection would overwrite the persisted HNSW metadata,
+        # hiding settings changes that need a rebuild
+        try:
+            return self.client.get_collection(name=self.settings.COLLECTION_NAME)
+        except ValueError:
+            return self.client.create_collection(
+                name=self.settings.COLLECTION_NAME,
+                metadata=self._collection_metadata()
+            )
+
+    def _collection_metadata(self) -> dict:
+        """HNSW settings for the products collection"""
+        # Embeddings are unit-normalized, so inner product equals cosine similarity
+        return {
+            "hnsw:space": "ip",
+            "hnsw:M": self.settings.HNSW_M,
+            "hnsw:construction_ef": self.settings.HNSW_EF_CONSTRUCTION,
+            "hnsw:search_ef": self.settings.HNSW_EF_SEARCH
+        }
 
     def _clean_html(self, text: str) -> str:
         """Remove HTML tags and normalize whitespace"""
-        clean = re.sub('<[^<]+?>', '', text)
-        clean = re.sub(r'\s+', ' ', clean)
-        return clean.strip()
+        tree = HTMLParser(text)
+        tree.strip_tags(['script', 'style'])
+        clean = tree.text(separator=' ')
+        return ' '.join(clean.split())
+
+    def _build_preview(self, description: str) -> str:
+        """Build a short plain-text preview from a bounded slice of the HTML"""
+        raw = description[:_PREVIEW_RAW_LIMIT]
+        truncated = len(description) > _PREVIEW_RAW_LIMIT
+        if truncated and raw.rfind('<') > raw.rfind('>'):
+            # Drop a tag cut in half by the window
+            raw = raw[:raw.rfind('<')]
+        clean_desc = self._clean_html(raw)
+        if len(clean_desc) > _PREVIEW_LENGTH or truncated:
+            return clean_desc[:_PREVIEW_LENGTH] + "..."
+        return clean_desc
 
     async def load_products(self) -> List[Product]:
         """Load products from JSON and index them"""
 
+        if self.settings.READ_ONLY:
+            logger.info(
+                f"Read-only mode: serving existing index with "
+                f"{self.collection.count()} documents"
+            )
+            return []
+
         products_path = self.settings.products_json_path
         logger.info(f"Loading products from: {products_path}")
 
         # Load JSON
         try:
-            with open(products_path, 'r', encoding='utf-8') as f:
-                products_data = json.load(f)
+            with open(products_path, 'rb') as f:
+                products_data = orjson.loads(f.read())
         except FileNotFoundError:
             logger.error(f"Products file not found: {products_path}")
             raise
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in products file: {e}")
             raise
 
-        # Parse products
+        # Parse products (trusted export, so convert types without validation)
         products = []
+        seen_ids = set()
         for item in products_data:
             try:
-                product = Product(
-                    id=item['id'],
+                description = item.get('description', '')
+                if item['price'] is None:
+                    raise ValueError("price is missing")
+                product = Product.model_construct(
+                    id=int(item['id']),
                     name=item['name'],
                     slug=item['slug'],
                     permalink=item['permalink'],
-                    description=item.get('description', ''),
-                    date_created=item['date_created'],
+                    description=description,
+                    description_preview=self._build_preview(description),
+                    date_created=datetime.fromisoformat(item['date_created']),
                     status=item['status'],
-                    price=item['price']
+                    price=str(item['price'])
                 )
+                if product.id in seen_ids:
+                    logger.warning(f"Skipping duplicate product id {product.id}")
+                    continue
+                seen_ids.add(product.id)
                 products.append(product)
             except Exception as e:
                 logger.warning(f"Error parsing product {item.get('id')}: {e}")
                 continue
 
-        self._products_cache = products
         logger.info(f"✅ Loaded {len(products)} products")
 
+        catalog_hash = self._catalog_hash(products)
+        stored_hash = (self._read_manifest() or {}).get("catalog_hash")
+
+        # Rebuild indexes that are stale, left partial or use an older layout
+        indexed_count = self.collection.count()
+        if indexed_count > 0:
+            if self.settings.FORCE_REINDEX:
+                reason = "re-index forced by settings"
+            elif indexed_count != len(products):
+                reason = f"{indexed_count} documents for {len(products)} products"
+            elif stored_hash != catalog_hash:
+                reason = "products changed since last indexing"
+            elif not self._index_is_current():
+                reason = "collection layout changed"
+            else:
+                reason = None
+
+            if reason:
+                logger.info(f"Collection is outdated ({reason}). Re-indexing...")
+                self.reset_collection()
+
         # Index in ChromaDB if not already indexed
         if self.collection.count() == 0:
             logger.info("Collection is empty. Starting indexing...")
-            await self._index_products(products)
+            try:
+                await self._index_products(products)
+            except Exception:
+                # Never leave a partial index behind to be served later
+                logger.error("Indexing failed. Clearing partial collection.")
+                self.reset_collection()
+                raise
         else:
             logger.info(
                 f"Collection already has {self.collection.count()} documents. "
                 "Skipping indexing."
             )
 
+        self._write_manifest({
+            "total_products": len(products),
+            "catalog_hash": catalog_hash
+        })
         return products
 
+    @staticmethod
+    def _catalog_hash(products: List[Product]) -> str:
+        """Content hash of the parsed catalog, used to detect edited products"""
+        digest = hashlib.sha256()
+        for product in products:
+            digest.update(orjson.dumps(product.model_dump()))
+        return digest.hexdigest()
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Persist catalog facts next to the index for read-only workers"""
+        with open(self.settings.index_manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        self._manifest = manifest
+
+    def _read_manifest(self) -> Optional[dict]:
+        """Load the index manifest from disk, if one was written"""
+        try:
+            with open(self.settings.index_manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get_total_products(self) -> Optional[int]:
+        """Number of products in the source catalog, from the index manifest"""
+        if self._manifest is None:
+            self._manifest = self._read_manifest()
+            if self._manifest is None:
+                return None
+        return self._manifest.get("total_products")
+
+    def _index_is_current(self) -> bool:
+        """Check collection settings and that metadata holds every Product field"""
+        collection_metadata = self.collection.metadata or {}
+        for key, value in self._collection_metadata().items():
+            if collection_metadata.get(key) != value:
+                return False
+
+        sample = self.collection.get(limit=1, include=["metadatas"])
+        if not sample['metadatas']:
+            return False
+        return _PRODUCT_METADATA_FIELDS.issubset(sample['metadatas'][0])
+
+    @staticmethod
+    def _product_from_metadata(product_id: int, metadata: dict) -> Product:
+        """Rebuild a Product from its Chroma metadata"""
+        # Metadata was written from already-converted Products at index time
+        return Product.model_construct(
+            id=product_id,
+            name=metadata['name'],
+            slug=metadata['slug'],
+            permalink=metadata['permalink'],
+            description=metadata['description'],
+            description_preview=metadata['description_preview'],
+            price=str(metadata['price']),
+            date_created=datetime.fromisoformat(metadata['date_created']),
+            status=metadata['status']
+        )
+
     async def _index_products(self, products: List[Product]):
-        """Index products in vector database"""
+        """Index products in vector database in fixed-size chunks"""
 
         logger.info(f"Indexing {len(products)} products...")
+        batch_size = self.settings.INDEX_BATCH_SIZE
+
+        for start in range(0, len(products), batch_size):
+            chunk = products[start:start + batch_size]
+
+            documents = []
+            metadatas = []
+            ids = []
+
+            for product in chunk:
+                # Create searchable text
+                clean_desc = self._clean_html(product.description)
+                searchable_text = f"{product.name}\n\n{clean_desc}"
+
+                documents.append(searchable_text)
+                metadatas.append({
+                    "product_id": product.id,
+                    "name": product.name,
+                    "slug": product.slug,
+                    "permalink": product.permalink,
+                    "description": product.description,
+                    "description_preview": product.description_preview,
+                    "price": product.price,
+                    "date_created": product.date_created.isoformat(),
+                    "status": product.status
+                })
+                ids.append(str(product.id))
+
+            # Generate embeddings
+            embeddings = self.embedding_service.embed_texts(documents)
+
+            # Add to ChromaDB (chromadb 0.4.x only accepts nested lists)
+            self.collection.add(
+                embeddings=embeddings.tolist(),
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids
+            )
 
-        documents = []
-        metadatas = []
-        ids = []
-
-        for product in products:
-            # Create searchable text
-            clean_desc = self._clean_html(product.description)
-            searchable_text = f"{product.name}\n\n{clean_desc}"
-
-            documents.append(searchable_text)
-            metadatas.append({
-                "product_id": product.id,
-                "name": product.name,
-                "slug": product.slug,
-                "permalink": product.permalink
-            })
-            ids.append(str(product.id))
-
-        # Generate embeddings
-        logger.info("Generating embeddings...")
-        embeddings = self.embedding_service.embed_texts(documents)
-
-        # Add to ChromaDB
-        logger.info("Adding to ChromaDB...")
-        self.collection.add(
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+            logger.info(
+                f"Indexed {start + len(chunk)}/{len(products)} products"
+            )
 
         logger.info(
             f"✅ Successfully indexed {len(products)} products in ChromaDB"
         )
 
+    async def embed_query(self, query: str, use_cache: bool = True) -> List[float]:
+        """Generate embedding for a search query"""
+        return await self.embedding_service.embed_text_async(
+            query,
+            use_cache=use_cache
+        )
+
     async def search_products(
             self,
             query: str,
-            top_k: int = 5
+            top_k: int = 5,
+            min_relevance_score: float = 0.0,
+            use_cache: bool = True,
+            query_embedding: Optional[List[float]] = None
     ) -> List[SearchResult]:
         """Search products using semantic similarity"""
 
         logger.debug(f"Searching for: '{query}' with top_k={top_k}")
 
-        # Generate query embedding
-        query_embedding = self.embedding_service.embed_text(query)
+        # Generate query embedding unless the caller already has one
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query, use_cache=use_cache)
 
-        # Search in ChromaDB
-        results = self.collection.query(
+        # Search in ChromaDB off the event loop
+        results = await asyncio.to_thread(
+            self.collection.query,
             query_embeddings=[query_embedding],
             n_results=top_k,
             include=["documents", "metadatas", "distances"]
         )
 
-        # Convert to SearchResult entities
+        search_results = self._to_search_results(
+            results['ids'][0] if results['ids'] else [],
+            results['distances'][0] if results['distances'] else [],
+            results['documents'][0] if results['documents'] else [],
+            results['metadatas'][0] if results['metadatas'] else [],
+            min_relevance_score
+        )
+
+        logger.debug(f"Found {len(search_results)} results")
+        return search_results
+
+    async def embed_queries(
+            self,
+            queries: List[str],
+            use_cache: Optional[List[bool]] = None
+    ) -> List[List[float]]:
+        """Generate embeddings for several search queries in one forward pass"""
+        return await asyncio.to_thread(
+            self.embedding_service.embed_queries,
+            queries,
+            use_cache
+        )
+
+    async def search_products_batch(
+            self,
+            query_embeddings: List[List[float]],
+            top_ks: List[int],
+            min_relevance_score: float = 0.0
+    ) -> List[List[SearchResult]]:
+        """Search several query embeddings with a single collection query"""
+
+        if not query_embeddings:
+            return []
+
+        # Fetch the largest top_k once; ascending hits slice down per query
+        results = await asyncio.to_thread(
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=max(top_ks),
+            include=["documents", "metadatas", "distances"]
+        )
+
+        return [
+            self._to_search_results(
+                results['ids'][row][:top_k],
+                results['distances'][row][:top_k],
+                results['documents'][row][:top_k],
+                results['metadatas'][row][:top_k],
+                min_relevance_score
+            )
+            for row, top_k in enumerate(top_ks)
+        ]
+
+    def _to_search_results(
+            self,
+            ids: List[str],
+            distances: List[float],
+            documents: List[str],
+            metadatas: List[dict],
+            min_relevance_score: float
+    ) -> List[SearchResult]:
+        """Convert one row of a Chroma query result to SearchResult entities"""
         search_results = []
+        max_distance = 1.0 - min_relevance_score
 
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                product_id = int(results['ids'][0][i])
-                distance = results['distances'][0][i]
-                document = results['documents'][0][i]
+        for product_id, distance, document, metadata in zip(ids, distances, documents, metadatas):
+            # Distances are ascending, so the rest are below the threshold
+            if distance > max_distance:
+                break
 
-                # Convert distance to similarity score (cosine distance -> similarity)
-                relevance_score = max(0.0, 1.0 - distance)
+            # Convert distance to similarity score (ip distance is 1 - cosine for unit vectors)
+            relevance_score = max(0.0, 1.0 - distance)
 
-                # Get full product from cache
-                product = await self.get_product_by_id(product_id)
+            # Rebuild full product from stored metadata
+            product = self._product_from_metadata(int(product_id), metadata)
 
-                if product:
-                    search_results.append(SearchResult(
-                        product=product,
-                        relevance_score=relevance_score,
-                        matched_content=document[:300]
-                    ))
+            search_results.append(SearchResult(
+                product=product,
+                relevance_score=relevance_score,
+                matched_content=document[:300]
+            ))
 
-        logger.debug(f"Found {len(search_results)} results")
         return search_results
 
     async def get_product_by_id(self, product_id: int) -> Optional[Product]:
-        """Get product by ID from cache"""
-        for product in self._products_cache:
-            if product.id == product_id:
-                return product
-        return None
+        """Get product by ID from the indexed metadata"""
+        result = await asyncio.to_thread(
+            self.collection.get,
+            ids=[str(product_id)],
+            include=["metadatas"]
+        )
+        if not result['ids']:
+            return None
+        return self._product_from_metadata(product_id, result['metadatas'][0])
+
+    def warmup(self) -> None:
+        """Warm the embedding model and pull HNSW index files into page cache"""
+        logger.info("Warming up embedding model and vector index...")
+        self.embedding_service.warmup()
+        self._prefault_index_files()
+
+        if self.collection.count() > 0:
+            dimension = self.embedding_service.model.get_sentence_embedding_dimension()
+            self.collection.query(
+                query_embeddings=[[0.0] * dimension],
+                n_results=1
+            )
+        logger.info("✅ Warmup complete")
+
+    def _prefault_index_files(self) -> None:
+        """Hint the kernel to read persisted HNSW segments ahead of first use"""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        for path in self.settings.chroma_persist_path.rglob("*.bin"):
+            try:
+                with open(path, "rb") as f:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError as e:
+                logger.debug(f"Could not prefault {path}: {e}")
 
     def reset_collection(self):
         """Reset the collection (useful for re-indexing)"""
@@ -204,6 +466,6 @@ class ChromaProductRepository(ProductRepository):
         self.client.delete_collection(self.settings.COLLECTION_NAME)
         self.collection = self.client.create_collection(
             name=self.settings.COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"}
+            metadata=self._collection_metadata()
         )
         logger.info("✅ Collection reset complete")
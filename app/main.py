@@ -1,7 +1,11 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from anyio import to_thread
+import asyncio
 import logging
 import sys
 
@@ -41,11 +45,29 @@ async def lifespan(app: FastAPI):
     logger.info(f"Collection: {settings.COLLECTION_NAME}")
     logger.info("=" * 60)
 
+    # Size the pool running encodes and Chroma queries (asyncio.to_thread,
+    # run_in_executor) and AnyIO's limiter for sync dependencies/routes
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.THREAD_POOL_SIZE,
+            thread_name_prefix="blocking-io"
+        )
+    )
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_POOL_SIZE
+
     try:
         # Load and index products
         repository = get_product_repository()
-        products = await repository.load_products()
-        logger.info(f"✅ Loaded {len(products)} products successfully")
+        # Keep only the count; the product list is not needed after indexing
+        product_count = len(await repository.load_products())
+        if not settings.READ_ONLY:
+            logger.info(f"✅ Loaded {product_count} products successfully")
+
+        # Pay the cold-start cost before serving traffic
+        repository.warmup()
+
+        # Start coalescing concurrent query encodes
+        await repository.embedding_service.batcher.start()
         logger.info("=" * 60)
         logger.info("🎉 API is ready to accept requests!")
         logger.info("=" * 60)
@@ -57,6 +79,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("👋 Shutting down gracefully...")
+    await repository.embedding_service.batcher.stop()
 
 
 # Create FastAPI app
@@ -65,6 +88,7 @@ app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     description="Digital Marketing Business Consultant Chatbot API"